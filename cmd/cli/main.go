@@ -1,8 +1,16 @@
 // Command tms-engine reads a SimulationInput JSON from a file argument (or stdin),
 // runs the simulation, and writes the SimulationLog JSON to stdout.
+//
+// Flags:
+//
+//	--output-path PATH  write the SimulationLog to PATH instead of stdout
+//	--capabilities      print the optional features this build supports as a
+//	                    JSON list of names, then exit
 package main
 
 import (
+	"encoding/json"
+	"flag"
 	"fmt"
 	"io"
 	"os"
@@ -10,27 +18,63 @@ import (
 	"github.com/cxd309/tms-engine/internal/engine"
 )
 
+// capabilities names the optional features a wrapper may rely on once
+// --capabilities has reported them. Builds without the flag fail the probe,
+// so wrappers treat that as supporting none of them.
+var capabilities = []string{
+	"batch",       // "simulation_batch" inputs; see engine.SimulationBatchInput
+	"output_path", // --output-path
+}
+
 func main() {
+	if err := run(os.Args[1:], os.Stdin, os.Stdout); err != nil {
+		fmt.Fprintln(os.Stderr, err)
+		os.Exit(1)
+	}
+}
+
+// run is the CLI without the process exit, so it can be tested.
+func run(args []string, stdin io.Reader, stdout io.Writer) error {
+	flags := flag.NewFlagSet("tms-engine", flag.ContinueOnError)
+	outputPath := flags.String("output-path", "", "write the log to this file instead of stdout")
+	showCapabilities := flags.Bool("capabilities", false, "print supported features as JSON and exit")
+	if err := flags.Parse(args); err != nil {
+		return err
+	}
+
+	if *showCapabilities {
+		out, err := json.Marshal(capabilities)
+		if err != nil {
+			return fmt.Errorf("marshaling capabilities: %w", err)
+		}
+		_, err = fmt.Fprintln(stdout, string(out))
+		return err
+	}
+
 	var (
 		data []byte
 		err  error
 	)
-
-	if len(os.Args) > 1 {
-		data, err = os.ReadFile(os.Args[1])
+	if flags.NArg() > 0 {
+		data, err = os.ReadFile(flags.Arg(0))
 	} else {
-		data, err = io.ReadAll(os.Stdin)
+		data, err = io.ReadAll(stdin)
 	}
 	if err != nil {
-		fmt.Fprintf(os.Stderr, "error reading input: %v\n", err)
-		os.Exit(1)
+		return fmt.Errorf("error reading input: %w", err)
 	}
 
 	result, err := engine.RunJSON(string(data))
 	if err != nil {
-		fmt.Fprintf(os.Stderr, "simulation error: %v\n", err)
-		os.Exit(1)
+		return fmt.Errorf("simulation error: %w", err)
 	}
 
-	fmt.Println(result)
+	if *outputPath != "" {
+		if err := os.WriteFile(*outputPath, []byte(result), 0o644); err != nil {
+			return fmt.Errorf("error writing output: %w", err)
+		}
+		return nil
+	}
+	_, err = fmt.Fprintln(stdout, result)
+	return err
 }
@@ -0,0 +1,111 @@
+package main
+
+import (
+	"bytes"
+	"encoding/json"
+	"os"
+	"path/filepath"
+	"slices"
+	"strings"
+	"testing"
+)
+
+const testInput = `{
+	"simulation_meta": {"simulation_id": "t", "run_time": 2, "time_step": 1},
+	"graph_data": {
+		"nodes": [{"node_id": "A"}, {"node_id": "B"}],
+		"edges": [{"edge_id": "A->B", "u": "A", "v": "B", "length": 100}]
+	},
+	"service_list": []
+}`
+
+func TestCapabilities(t *testing.T) {
+	var stdout bytes.Buffer
+	if err := run([]string{"--capabilities"}, strings.NewReader(""), &stdout); err != nil {
+		t.Fatal(err)
+	}
+	var got []string
+	if err := json.Unmarshal(stdout.Bytes(), &got); err != nil {
+		t.Fatalf("capabilities are not a JSON list: %v", err)
+	}
+	for _, want := range []string{"batch", "output_path"} {
+		if !slices.Contains(got, want) {
+			t.Errorf("capabilities = %v, want %s", got, want)
+		}
+	}
+}
+
+func TestRunFromStdin(t *testing.T) {
+	var stdout bytes.Buffer
+	if err := run(nil, strings.NewReader(testInput), &stdout); err != nil {
+		t.Fatal(err)
+	}
+	var log struct {
+		Output []json.RawMessage `json:"output"`
+	}
+	if err := json.Unmarshal(stdout.Bytes(), &log); err != nil {
+		t.Fatal(err)
+	}
+	if len(log.Output) != 3 {
+		t.Errorf("got %d log rows, want 3", len(log.Output))
+	}
+}
+
+func TestRunBatch(t *testing.T) {
+	input := strings.Replace(testInput,
+		`"simulation_meta": {"simulation_id": "t", "run_time": 2, "time_step": 1}`,
+		`"simulation_batch": [
+			{"simulation_id": "a", "run_time": 2, "time_step": 1},
+			{"simulation_id": "b", "run_time": 4, "time_step": 2}
+		]`, 1)
+	var stdout bytes.Buffer
+	if err := run(nil, strings.NewReader(input), &stdout); err != nil {
+		t.Fatal(err)
+	}
+	var batchLog struct {
+		Batch []struct {
+			Meta struct {
+				SimulationID string `json:"simulation_id"`
+			} `json:"simulation_meta"`
+			Output []json.RawMessage `json:"output"`
+		} `json:"simulation_batch"`
+	}
+	if err := json.Unmarshal(stdout.Bytes(), &batchLog); err != nil {
+		t.Fatal(err)
+	}
+	if len(batchLog.Batch) != 2 {
+		t.Fatalf("got %d logs, want 2", len(batchLog.Batch))
+	}
+	for i, want := range []string{"a", "b"} {
+		log := batchLog.Batch[i]
+		if log.Meta.SimulationID != want || len(log.Output) != 3 {
+			t.Errorf("log %d: id %q with %d rows, want %q with 3",
+				i, log.Meta.SimulationID, len(log.Output), want)
+		}
+	}
+}
+
+func TestOutputPath(t *testing.T) {
+	path := filepath.Join(t.TempDir(), "log.json")
+	var stdout bytes.Buffer
+	if err := run([]string{"--output-path", path}, strings.NewReader(testInput), &stdout); err != nil {
+		t.Fatal(err)
+	}
+	if stdout.Len() != 0 {
+		t.Errorf("stdout = %q, want nothing", stdout.String())
+	}
+	data, err := os.ReadFile(path)
+	if err != nil {
+		t.Fatal(err)
+	}
+	if !json.Valid(data) {
+		t.Errorf("output file is not valid JSON: %q", data)
+	}
+}
+
+func TestInvalidInput(t *testing.T) {
+	err := run(nil, strings.NewReader("not json"), &bytes.Buffer{})
+	if err == nil || !strings.HasPrefix(err.Error(), "simulation error:") {
+		t.Errorf("err = %v, want a simulation error", err)
+	}
+}
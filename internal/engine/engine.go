@@ -26,9 +26,14 @@ func NewTMS(input SimulationInput) (*TMS, error) {
 	if err != nil {
 		return nil, fmt.Errorf("building graph: %w", err)
 	}
+	return newTMSOnGraph(input.Meta, g, input.ServiceList)
+}
 
-	services := make([]*service.SimService, 0, len(input.ServiceList))
-	for _, svc := range input.ServiceList {
+// newTMSOnGraph constructs a TMS on an already built graph. The graph is only
+// read during a run, so one graph can back several runs in turn.
+func newTMSOnGraph(meta SimulationMeta, g *graph.Graph, serviceList []service.Service) (*TMS, error) {
+	services := make([]*service.SimService, 0, len(serviceList))
+	for _, svc := range serviceList {
 		firstStop, _, err := service.GetFirstStop(svc)
 		if err != nil {
 			return nil, fmt.Errorf("service %q: %w", svc.ServiceID, err)
@@ -45,7 +50,7 @@ func NewTMS(input SimulationInput) (*TMS, error) {
 	}
 
 	return &TMS{
-		meta:     input.Meta,
+		meta:     meta,
 		graph:    g,
 		services: services,
 		curTime:  0,
@@ -342,25 +347,69 @@ func constrainedKinematics(svc *service.SimService, grantedDist float64) (float6
 // RunJSON is the primary entry point for all three compilation targets (CLI, WASM, clib).
 // It accepts a JSON-encoded SimulationInput, runs the simulation, and returns a
 // JSON-encoded SimulationLog.
+//
+// An input with a "simulation_batch" list in place of "simulation_meta" is a
+// SimulationBatchInput instead: it is run once per batch entry and a
+// JSON-encoded SimulationBatchLog is returned.
 func RunJSON(jsonInput string) (string, error) {
-	var input SimulationInput
+	// Decode both shapes in one pass, then pick by whether a batch was given.
+	var input struct {
+		SimulationInput
+		Batch []SimulationMeta `json:"simulation_batch"`
+	}
 	if err := json.Unmarshal([]byte(jsonInput), &input); err != nil {
 		return "", fmt.Errorf("invalid input JSON: %w", err)
 	}
 
-	tms, err := NewTMS(input)
-	if err != nil {
-		return "", err
+	var output any
+	if input.Batch != nil {
+		batchLog, err := RunBatch(SimulationBatchInput{
+			Batch:       input.Batch,
+			GraphData:   input.GraphData,
+			ServiceList: input.ServiceList,
+		})
+		if err != nil {
+			return "", err
+		}
+		output = batchLog
+	} else {
+		tms, err := NewTMS(input.SimulationInput)
+		if err != nil {
+			return "", err
+		}
+		simLog, err := tms.Run()
+		if err != nil {
+			return "", err
+		}
+		output = simLog
 	}
 
-	simLog, err := tms.Run()
+	out, err := json.Marshal(output)
 	if err != nil {
-		return "", err
+		return "", fmt.Errorf("marshaling output: %w", err)
 	}
+	return string(out), nil
+}
 
-	out, err := json.Marshal(simLog)
+// RunBatch runs every entry of a SimulationBatchInput in order, building the
+// graph once for all of them.
+func RunBatch(input SimulationBatchInput) (SimulationBatchLog, error) {
+	g, err := graph.NewGraph(input.GraphData)
 	if err != nil {
-		return "", fmt.Errorf("marshaling output: %w", err)
+		return SimulationBatchLog{}, fmt.Errorf("building graph: %w", err)
 	}
-	return string(out), nil
+
+	batchLog := SimulationBatchLog{Batch: make([]SimulationLog, 0, len(input.Batch))}
+	for _, meta := range input.Batch {
+		tms, err := newTMSOnGraph(meta, g, input.ServiceList)
+		if err != nil {
+			return SimulationBatchLog{}, fmt.Errorf("simulation %q: %w", meta.SimulationID, err)
+		}
+		simLog, err := tms.Run()
+		if err != nil {
+			return SimulationBatchLog{}, fmt.Errorf("simulation %q: %w", meta.SimulationID, err)
+		}
+		batchLog.Batch = append(batchLog.Batch, simLog)
+	}
+	return batchLog, nil
 }
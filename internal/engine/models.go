@@ -19,6 +19,14 @@ type SimulationInput struct {
 	ServiceList []service.Service `json:"service_list"`
 }
 
+// SimulationBatchInput runs one network and service list once per entry in
+// Batch, so a parameter sweep is parsed and its graph built only once.
+type SimulationBatchInput struct {
+	Batch       []SimulationMeta  `json:"simulation_batch"`
+	GraphData   graph.GraphData   `json:"graph_data"`
+	ServiceList []service.Service `json:"service_list"`
+}
+
 // SimulationLogRow is the state of all services at a single simulation timestep.
 type SimulationLogRow struct {
 	Timestamp   float64              `json:"timestamp"` // seconds
@@ -31,6 +39,11 @@ type SimulationLog struct {
 	Output []SimulationLogRow `json:"output"`
 }
 
+// SimulationBatchLog is the output of a batch run: one log per batch entry, in order.
+type SimulationBatchLog struct {
+	Batch []SimulationLog `json:"simulation_batch"`
+}
+
 // movementAuthority is the distance ahead (metres) a service is authorised to travel.
 type movementAuthority = float64
 
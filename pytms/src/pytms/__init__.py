@@ -1,5 +1,18 @@
-from .models import RouteStop, Service, Vehicle
+from .cache import clear_cache
+from .igraph_network import IGraphNetwork
+from .models import RouteStop, RunConfig, Service, Vehicle
 from .network import Network
+from .pool import EnginePool
 from .results import SimulationResult
 
-__all__ = ["Network", "Vehicle", "RouteStop", "Service", "SimulationResult"]
+__all__ = [
+    "Network",
+    "IGraphNetwork",
+    "Vehicle",
+    "RouteStop",
+    "Service",
+    "RunConfig",
+    "SimulationResult",
+    "EnginePool",
+    "clear_cache",
+]
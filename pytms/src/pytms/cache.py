@@ -0,0 +1,43 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import orjson
+
+_MAX_ENTRIES = 32
+
+_entries: OrderedDict[bytes, dict] = OrderedDict()
+_lock = threading.Lock()
+
+
+def _payload_key(payload: dict) -> bytes:
+    """Hash an engine payload, ignoring its simulation_id.
+
+    The id is usually auto-generated per run, so it is left out of the key to let
+    reruns of the same network and settings hit the cache.
+    """
+    meta = {k: v for k, v in payload["simulation_meta"].items() if k != "simulation_id"}
+    keyed = {**payload, "simulation_meta": meta}
+    return hashlib.blake2b(orjson.dumps(keyed, option=orjson.OPT_SORT_KEYS)).digest()
+
+
+def _get(key: bytes) -> dict | None:
+    with _lock:
+        raw = _entries.get(key)
+        if raw is not None:
+            _entries.move_to_end(key)
+        return raw
+
+
+def _put(key: bytes, raw: dict) -> None:
+    with _lock:
+        _entries[key] = raw
+        _entries.move_to_end(key)
+        while len(_entries) > _MAX_ENTRIES:
+            _entries.popitem(last=False)
+
+
+def clear_cache() -> None:
+    """Drop every cached simulation result."""
+    with _lock:
+        _entries.clear()
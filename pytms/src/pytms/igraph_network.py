@@ -0,0 +1,158 @@
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING, Any
+
+from .network import _format_reported, _NetworkBase, _raise_edge_errors
+
+if TYPE_CHECKING:
+    import igraph as ig
+
+
+def _import_igraph() -> Any:
+    try:
+        import igraph
+    except ImportError as e:
+        raise ImportError(
+            "igraph is required for IGraphNetwork; "
+            "install it with: pip install 'pytms[igraph]'"
+        ) from e
+    return igraph
+
+
+class IGraphNetwork(_NetworkBase):
+    """A transport network backed by igraph instead of networkx.
+
+    Offers the same add_node / add_edge / add_service / run API as Network,
+    but keeps nodes and edges in igraph's C storage, which takes far less
+    memory for large networks. The igraph.Graph is available as .graph for
+    analysis; node IDs are stored in the "name" vertex attribute. A graph
+    passed in must be directed and name every vertex. Edge attributes are
+    the same as Network's:
+      - length (float, metres): required
+      - speed_limit (float, m/s): optional
+
+    Each add_node / add_edge call updates igraph's indices, so build large
+    networks in one go with from_edges.
+    """
+
+    def __init__(self, graph: "ig.Graph | None" = None):
+        ig = _import_igraph()
+        super().__init__()
+        if graph is None:
+            graph = ig.Graph(directed=True)
+        elif not graph.is_directed():
+            raise ValueError(
+                "IGraphNetwork needs a directed graph; use graph.as_directed() "
+                "to run each undirected edge in both directions"
+            )
+        elif graph.vcount() and (
+            "name" not in graph.vs.attributes() or None in graph.vs["name"]
+        ):
+            raise ValueError(
+                "IGraphNetwork needs a node ID in every vertex's 'name' attribute"
+            )
+        self.graph = graph
+
+    @classmethod
+    def from_edges(
+        cls, edges: Iterable[dict], nodes: Iterable[str] = ()
+    ) -> "IGraphNetwork":
+        """Build a network from edge dicts in a single igraph call.
+
+        Each edge dict has "u" and "v" node IDs plus its attributes, e.g.
+        {"u": "A", "v": "B", "length": 1000.0}. Nodes are created from the
+        edge endpoints; pass nodes to add any that have no edges.
+        """
+        ig = _import_igraph()
+        graph = ig.Graph.DictList(
+            vertices=[{"name": n} for n in nodes] or None,
+            edges=edges,
+            directed=True,
+            edge_foreign_keys=("u", "v"),
+        )
+        for key in ("u", "v"):
+            if key in graph.es.attributes():
+                del graph.es[key]
+        return cls(graph)
+
+    def add_node(self, node_id: str) -> None:
+        if not self.has_node(node_id):
+            self.graph.add_vertex(name=node_id)
+
+    def add_edge(self, u: str, v: str, **attr) -> None:
+        """Add the edge u -> v, or update its attributes if it exists already.
+
+        As with networkx, re-adding an edge never creates a parallel one.
+        """
+        self.add_node(u)
+        self.add_node(v)
+        eid = self.graph.get_eid(u, v, error=False)
+        if eid == -1:
+            self.graph.add_edge(u, v, **attr)
+        else:
+            self.graph.es[eid].update_attributes(**attr)
+
+    def has_node(self, node_id: str) -> bool:
+        try:
+            self.graph.vs.find(name=node_id)
+        except (ValueError, KeyError):
+            return False
+        return True
+
+    def _engine_nodes(self) -> Iterator[dict]:
+        for n in self._node_names():
+            yield {"node_id": n}
+
+    def _engine_edges(self) -> Iterator[dict]:
+        # Attributes come out of igraph as whole columns, one call each.
+        lengths = self._edge_column("length")
+        speeds = self._edge_column("speed_limit")
+        names = self._node_names()
+        for (s, t), length, speed_limit in zip(
+            self.graph.get_edgelist(), lengths, speeds
+        ):
+            u, v = names[s], names[t]
+            edge = {"edge_id": f"{u}->{v}", "u": u, "v": v, "length": length}
+            if speed_limit is not None:
+                edge["speed_limit"] = speed_limit
+            yield edge
+
+    def _validate_edges(self) -> None:
+        names = self._node_names()
+        missing = []
+        # igraph allows parallel edges, e.g. from from_edges; the engine does not.
+        pairs = set()
+        parallel = []
+        seen = set()
+        duplicates = []
+        for (s, t), length in zip(
+            self.graph.get_edgelist(), self._edge_column("length")
+        ):
+            u, v = names[s], names[t]
+            if (s, t) in pairs:
+                parallel.append((u, v))
+                continue
+            pairs.add((s, t))
+            if length is None:
+                missing.append((u, v))
+                continue
+            edge_id = f"{u}->{v}"
+            if edge_id in seen:
+                duplicates.append(edge_id)
+            seen.add(edge_id)
+        if parallel:
+            shown = _format_reported([f"({u!r}, {v!r})" for u, v in parallel])
+            raise ValueError(f"Parallel edges are not supported: {shown}")
+        _raise_edge_errors(missing, duplicates)
+
+    def _edge_column(self, attribute: str) -> list:
+        """Every edge's value of attribute, or all None if no edge has it."""
+        es = self.graph.es
+        if attribute in es.attributes():
+            return es[attribute]
+        return [None] * len(es)
+
+    def _node_names(self) -> list:
+        # An empty graph has no "name" attribute until its first add_node.
+        if "name" in self.graph.vs.attributes():
+            return self.graph.vs["name"]
+        return []
@@ -1,8 +1,10 @@
 from dataclasses import dataclass
+from functools import cached_property
 from typing import Annotated
 
 
-@dataclass
+# Vehicle is not slotted: cached_property needs an instance __dict__.
+@dataclass(frozen=True)
 class Vehicle:
     name: str
     length: Annotated[float, "metres"]
@@ -22,31 +24,47 @@ class Vehicle:
             },
         }
 
+    @cached_property
+    def _engine_dict(self) -> dict:
+        """_to_engine_dict(), built once and shared by every service using it."""
+        return self._to_engine_dict()
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class RouteStop:
     node_id: str
     t_dwell: Annotated[float, "seconds"] = 0.0
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Service:
     service_id: str
     vehicle: Vehicle
     initial_position: str
-    route: list[RouteStop]
+    route: tuple[RouteStop, ...]
     departure_delay: Annotated[float, "seconds"] = 0.0
 
+    def __post_init__(self):
+        # route may be given as any iterable, e.g. a list, but is stored as a
+        # tuple so a service cannot change after serialization.
+        object.__setattr__(self, "route", tuple(self.route))
+
     def _to_engine_dict(self) -> dict:
         d = {
             "service_id": self.service_id,
-            "vehicle": self.vehicle._to_engine_dict(),
+            "vehicle": self.vehicle._engine_dict,
             "initial_position": self.initial_position,
-            "route": [
-                {"node_id": stop.node_id, "t_dwell": stop.t_dwell}
-                for stop in self.route
-            ],
+            # RouteStop already has the engine's shape, and orjson encodes
+            # dataclasses natively, so stops are passed through as they are.
+            "route": self.route,
         }
         if self.departure_delay:
             d["departure_delay"] = self.departure_delay
         return d
+
+
+@dataclass
+class RunConfig:
+    run_time: Annotated[float, "seconds"]
+    time_step: Annotated[float, "seconds"] = 1.0
+    simulation_id: str | None = None
@@ -1,36 +1,53 @@
-import json
-import uuid
+import abc
+import asyncio
+import io
+import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import IO, TYPE_CHECKING
 
 import networkx as nx
+import orjson
 
-from .models import Service
+from . import cache as _cache
+from .models import RunConfig, Service
 from .results import SimulationResult
-from .runner import run_engine
+from .runner import _engine_capabilities, run_engine, run_engine_async
 
+if TYPE_CHECKING:
+    from .pool import EnginePool
 
-class Network(nx.DiGraph):
-    """A transport network. Extends nx.DiGraph with simulation capabilities.
+_MAX_REPORTED_EDGES = 10
+_ARRAY_CHUNK_SIZE = 4096
 
-    Nodes and edges are standard networkx — use any nx tools for analysis,
-    path-finding, or visualisation. Edge attributes:
-      - length (float, metres): required
-      - speed_limit (float, m/s): optional
 
-    Services are attached separately and run against the network.
+class _NetworkBase(abc.ABC):
+    """Services and the simulation API shared by every network backend.
+
+    Subclasses store the graph and provide _engine_nodes and _engine_edges,
+    which yield the engine's node and edge records, and _validate_edges, which
+    checks those records can be built.
     """
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self._services: list[Service] = []
+        self._services_json: bytes | None = None
 
     def add_service(self, service: Service) -> None:
         self._services.append(service)
+        self._services_json = None
 
     def run(
         self,
         run_time: float,
         time_step: float = 1.0,
         simulation_id: str | None = None,
+        cache: bool = False,
+        pool: "EnginePool | None" = None,
+        shared_memory: bool = False,
     ) -> SimulationResult:
         """Run the simulation and return the result.
 
@@ -38,42 +55,347 @@ class Network(nx.DiGraph):
             run_time: Total simulation duration in seconds.
             time_step: Timestep size in seconds.
             simulation_id: Optional identifier for the run; auto-generated if omitted.
+            cache: Reuse the output of an earlier cached run with identical inputs
+                (ignoring simulation_id) instead of invoking the engine again.
+                Cached results share their output data, so treat it as read-only.
+            pool: Optional EnginePool whose long-lived engine runs the simulation.
+            shared_memory: Have the engine return its output through a file in
+                /dev/shm, if it supports that, rather than through a pipe; see
+                runner.run_engine. Worth it for long runs with large outputs.
+                Ignored when pool is given.
         """
-        sim_id = simulation_id or str(uuid.uuid4())
+        self._validate()
+        if pool is not None:
+            engine = pool.run_engine
+        elif shared_memory:
+            engine = partial(run_engine, shared_memory=True)
+        else:
+            engine = run_engine
+        sim_id = simulation_id or _new_simulation_id()
+        if not cache:
+            write_payload = partial(
+                self._write_engine_input, sim_id, run_time, time_step
+            )
+            return SimulationResult(engine(write_payload))
+
         payload = self._build_engine_input(sim_id, run_time, time_step)
-        raw = run_engine(json.dumps(payload))
-        return SimulationResult(raw)
+        key = _cache._payload_key(payload)
+        raw = _cache._get(key)
+        if raw is None:
+            raw = engine(orjson.dumps(payload))
+            _cache._put(key, raw)
+        meta = {**raw["simulation_meta"], "simulation_id": sim_id}
+        return SimulationResult({**raw, "simulation_meta": meta})
+
+    def run_many(self, configs: Iterable[RunConfig]) -> list[SimulationResult]:
+        """Run one simulation per config and return the results in the same order.
+
+        When the engine supports batches, all runs share a single engine
+        invocation, so process startup and network parsing are paid once.
+        Otherwise the runs are made one after another.
+        """
+        configs = list(configs)
+        if not configs:
+            return []
+        self._validate()
+        if "batch" not in _engine_capabilities():
+            return [
+                self.run(cfg.run_time, cfg.time_step, cfg.simulation_id)
+                for cfg in configs
+            ]
+        batch = [
+            _simulation_meta(
+                cfg.simulation_id or _new_simulation_id(), cfg.run_time, cfg.time_step
+            )
+            for cfg in configs
+        ]
+        raw = run_engine(partial(self._write_batch_input, batch))
+        return [SimulationResult(log) for log in raw["simulation_batch"]]
+
+    def run_sweep(
+        self, configs: Iterable[RunConfig], workers: int | None = None
+    ) -> list[SimulationResult]:
+        """Run one simulation per config concurrently; results keep config order.
+
+        The network and services are serialized once and shared by every run.
+        Each run is a separate engine process, so threads are enough to keep
+        them all busy.
+
+        Args:
+            configs: The runs to make.
+            workers: Maximum number of concurrent engine processes; defaults to
+                the number of CPUs.
+        """
+        scenario = self._scenario()
+
+        def run_one(cfg: RunConfig) -> SimulationResult:
+            return SimulationResult(run_engine(_config_payload(cfg, scenario)))
+
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            return list(pool.map(run_one, configs))
+
+    async def run_async(
+        self,
+        run_time: float,
+        time_step: float = 1.0,
+        simulation_id: str | None = None,
+    ) -> SimulationResult:
+        """Async version of run, for use inside an event loop.
+
+        Args:
+            run_time: Total simulation duration in seconds.
+            time_step: Timestep size in seconds.
+            simulation_id: Optional identifier for the run; auto-generated if omitted.
+        """
+        sim_id = simulation_id or _new_simulation_id()
+
+        def payload() -> bytes:
+            self._validate()
+            fp = io.BytesIO()
+            self._write_engine_input(sim_id, run_time, time_step, fp)
+            return fp.getvalue()
+
+        # Serializing a large network takes a while; keep it off the event loop.
+        json_input = await asyncio.to_thread(payload)
+        return SimulationResult(await run_engine_async(json_input))
+
+    async def run_sweep_async(
+        self, configs: Iterable[RunConfig], workers: int | None = None
+    ) -> list[SimulationResult]:
+        """Async version of run_sweep; results keep config order.
+
+        Args:
+            configs: The runs to make.
+            workers: Maximum number of concurrent engine processes; defaults to
+                the number of CPUs.
+        """
+        scenario = await asyncio.to_thread(self._scenario)
+        limit = asyncio.Semaphore(workers or os.cpu_count() or 1)
+
+        async def run_one(cfg: RunConfig) -> SimulationResult:
+            # Build the payload only once a slot is free, so at most `workers`
+            # copies of the scenario are held at a time.
+            async with limit:
+                payload = _config_payload(cfg, scenario)
+                return SimulationResult(await run_engine_async(payload))
+
+        return list(await asyncio.gather(*(run_one(cfg) for cfg in configs)))
+
+    def _validate(self) -> None:
+        """Raise ValueError if the network cannot be sent to the engine.
+
+        Called by every run method before the engine is started, so a
+        malformed network never costs an engine process. The payload writers
+        below assume it has passed.
+        """
+        self._check_service_nodes()
+        self._validate_edges()
+
+    def _scenario(self) -> bytes:
+        """Validate the network and return it as written by _write_scenario."""
+        self._validate()
+        body = io.BytesIO()
+        self._write_scenario(body)
+        return body.getvalue()
 
     def _build_engine_input(
         self, simulation_id: str, run_time: float, time_step: float
     ) -> dict:
-        nodes = [{"node_id": n} for n in self.nodes]
-
-        edges = []
-        for u, v, data in self.edges(data=True):
-            if "length" not in data:
-                raise ValueError(
-                    f"Edge ({u!r}, {v!r}) is missing required attribute 'length'"
-                )
-            edge: dict = {
-                "edge_id": f"{u}->{v}",
-                "u": u,
-                "v": v,
-                "length": data["length"],
-            }
-            if "speed_limit" in data:
-                edge["speed_limit"] = data["speed_limit"]
-            edges.append(edge)
-
         return {
-            "simulation_meta": {
-                "simulation_id": simulation_id,
-                "run_time": run_time,
-                "time_step": time_step,
-            },
+            "simulation_meta": _simulation_meta(simulation_id, run_time, time_step),
             "graph_data": {
-                "nodes": nodes,
-                "edges": edges,
+                "nodes": list(self._engine_nodes()),
+                "edges": list(self._engine_edges()),
             },
-            "service_list": [svc._to_engine_dict() for svc in self._services],
+            "service_list": list(self._engine_services()),
         }
+
+    def _write_engine_input(
+        self, simulation_id: str, run_time: float, time_step: float, fp: IO[bytes]
+    ) -> None:
+        """Stream the payload built by _build_engine_input to fp."""
+        meta = _simulation_meta(simulation_id, run_time, time_step)
+        self._write_payload(fp, b"simulation_meta", meta)
+
+    def _write_batch_input(self, batch: list[dict], fp: IO[bytes]) -> None:
+        """Stream a payload that runs each simulation_meta in batch to fp."""
+        self._write_payload(fp, b"simulation_batch", batch)
+
+    def _write_payload(self, fp: IO[bytes], meta_key: bytes, meta: dict | list) -> None:
+        """Write the payload envelope, with meta under meta_key, to fp."""
+        fp.write(b'{"' + meta_key + b'":')
+        fp.write(orjson.dumps(meta))
+        self._write_scenario(fp)
+
+    def _write_scenario(self, fp: IO[bytes]) -> None:
+        """Write the rest of the payload after its meta entry: network and services.
+
+        The graph is serialized afresh on every call, so it always reflects the
+        current network; run_sweep writes it once and shares it between all
+        its runs. Services cannot change once added, so their encoding is kept
+        until add_service is called again. Records are serialized in bounded
+        chunks, so the payload is never held in memory as one dict tree.
+        """
+        fp.write(b',"graph_data":{"nodes":')
+        _write_array(fp, self._engine_nodes())
+        fp.write(b',"edges":')
+        _write_array(fp, self._engine_edges())
+        fp.write(b'},"service_list":')
+        if self._services_json is None:
+            buf = io.BytesIO()
+            _write_array(buf, self._engine_services())
+            self._services_json = buf.getvalue()
+        fp.write(self._services_json)
+        fp.write(b"}")
+
+    @abc.abstractmethod
+    def _engine_nodes(self) -> Iterator[dict]: ...
+
+    @abc.abstractmethod
+    def _engine_edges(self) -> Iterator[dict]: ...
+
+    @abc.abstractmethod
+    def _validate_edges(self) -> None:
+        """Raise ValueError for edges without a length or with clashing ids."""
+
+    def _engine_services(self) -> Iterator[dict]:
+        for svc in self._services:
+            yield svc._to_engine_dict()
+
+    def _check_service_nodes(self) -> None:
+        """Raise ValueError if a service starts at or stops on an unknown node.
+
+        Checked on every run rather than when the services are serialized, as
+        nodes can be removed after a service is added.
+        """
+        unknown = []
+        for svc in self._services:
+            node_ids = [svc.initial_position, *(stop.node_id for stop in svc.route)]
+            for node_id in dict.fromkeys(node_ids):
+                if not self.has_node(node_id):
+                    unknown.append((svc.service_id, node_id))
+        if unknown:
+            shown = _format_reported(
+                [f"{node_id!r} (service {sid!r})" for sid, node_id in unknown]
+            )
+            raise ValueError(f"Services refer to unknown nodes: {shown}")
+
+
+class Network(_NetworkBase, nx.DiGraph):
+    """A transport network. Extends nx.DiGraph with simulation capabilities.
+
+    Nodes and edges are standard networkx — use any nx tools for analysis,
+    path-finding, or visualisation. Edge attributes:
+      - length (float, metres): required
+      - speed_limit (float, m/s): optional
+
+    Services are attached separately and run against the network.
+    """
+
+    # The methods below read networkx's internal dict-of-dicts storage (_node
+    # and _adj) directly rather than going through the NodeView and
+    # EdgeDataView wrappers. Iteration order is the same as self.nodes and
+    # self.edges(data=True).
+
+    def _engine_nodes(self) -> Iterator[dict]:
+        for n in self._node:
+            yield {"node_id": n}
+
+    def _engine_edges(self) -> Iterator[dict]:
+        for u, nbrs in self._adj.items():
+            for v, data in nbrs.items():
+                # One .get() per attribute; _validate_edges has checked length.
+                edge = {
+                    "edge_id": f"{u}->{v}",
+                    "u": u,
+                    "v": v,
+                    "length": data.get("length"),
+                }
+                speed_limit = data.get("speed_limit")
+                if speed_limit is not None:
+                    edge["speed_limit"] = speed_limit
+                yield edge
+
+    def _validate_edges(self) -> None:
+        # Problems are collected and reported together once the pass is done,
+        # so a malformed network needs only one round of fixes.
+        missing = []
+        seen = set()
+        duplicates = []
+        for u, nbrs in self._adj.items():
+            for v, data in nbrs.items():
+                # A length of None counts as missing.
+                if data.get("length") is None:
+                    missing.append((u, v))
+                    continue
+                edge_id = f"{u}->{v}"
+                if edge_id in seen:
+                    duplicates.append(edge_id)
+                seen.add(edge_id)
+        _raise_edge_errors(missing, duplicates)
+
+
+def _new_simulation_id() -> str:
+    """A random 128-bit hex id, without the cost of building a uuid.UUID."""
+    return os.urandom(16).hex()
+
+
+def _simulation_meta(simulation_id: str, run_time: float, time_step: float) -> dict:
+    return {
+        "simulation_id": simulation_id,
+        "run_time": run_time,
+        "time_step": time_step,
+    }
+
+
+def _config_payload(cfg: RunConfig, scenario: bytes) -> bytes:
+    """Prefix scenario, as written by _write_scenario, with cfg's meta."""
+    sim_id = cfg.simulation_id or _new_simulation_id()
+    meta = _simulation_meta(sim_id, cfg.run_time, cfg.time_step)
+    return b'{"simulation_meta":' + orjson.dumps(meta) + scenario
+
+
+def _raise_edge_errors(missing: list[tuple], duplicates: list[str]) -> None:
+    """Raise ValueError for the problems a _validate_edges pass collected."""
+    if missing:
+        raise ValueError(_missing_length_message(missing))
+    if duplicates:
+        raise ValueError(
+            "Edge ids must be unique, but several edges map to "
+            f"{_format_reported([repr(e) for e in duplicates])}; "
+            "check for node IDs that are equal as strings or contain '->'"
+        )
+
+
+def _missing_length_message(missing: list[tuple]) -> str:
+    if len(missing) == 1:
+        u, v = missing[0]
+        return f"Edge ({u!r}, {v!r}) is missing required attribute 'length'"
+    shown = _format_reported([f"({u!r}, {v!r})" for u, v in missing])
+    return f"{len(missing)} edges are missing required attribute 'length': {shown}"
+
+
+def _format_reported(items: list[str]) -> str:
+    """Join the first _MAX_REPORTED_EDGES items, noting how many were left out."""
+    shown = ", ".join(items[:_MAX_REPORTED_EDGES])
+    if len(items) > _MAX_REPORTED_EDGES:
+        shown += f", ... and {len(items) - _MAX_REPORTED_EDGES} more"
+    return shown
+
+
+def _write_array(fp: IO[bytes], items: Iterable[dict]) -> None:
+    """Write items to fp as a JSON array.
+
+    Items are encoded _ARRAY_CHUNK_SIZE at a time, with one orjson call per
+    chunk and its brackets sliced off. That is far cheaper than one call per
+    item while still bounding how much of the payload is in memory at once.
+    """
+    it = iter(items)
+    fp.write(b"[")
+    chunk = list(islice(it, _ARRAY_CHUNK_SIZE))
+    while chunk:
+        fp.write(orjson.dumps(chunk)[1:-1])
+        chunk = list(islice(it, _ARRAY_CHUNK_SIZE))
+        if chunk:
+            fp.write(b",")
+    fp.write(b"]")
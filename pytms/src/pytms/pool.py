@@ -0,0 +1,92 @@
+import io
+import struct
+import subprocess
+import threading
+from collections.abc import Callable
+from typing import IO
+
+import orjson
+
+from .runner import _engine_capabilities, _find_binary, run_engine
+
+# Requests and responses are each prefixed with their length as a u64 (LE).
+_FRAME_HEADER = struct.Struct("<Q")
+
+
+class EnginePool:
+    """A long-lived tms-engine process shared by many runs.
+
+    Use as a context manager and pass it to Network.run(..., pool=pool), so the
+    engine process is started once rather than once per run:
+
+        with pytms.EnginePool() as pool:
+            for t in run_times:
+                net.run(t, pool=pool)
+
+    This needs an engine that advertises the "serve" capability. It is started
+    with --serve and exchanges length-prefixed frames over stdin/stdout: each
+    request is a payload, each response the simulation log or
+    {"error": message}. With engines that cannot serve, every run falls back to
+    its own engine process.
+    """
+
+    def __init__(self):
+        self._proc: subprocess.Popen | None = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "EnginePool":
+        if "serve" in _engine_capabilities():
+            self._proc = subprocess.Popen(
+                [str(_find_binary()), "--serve"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the engine process; closing its stdin asks it to exit."""
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        proc.stdin.close()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+
+    def run_engine(self, json_input: bytes | str | Callable[[IO[bytes]], None]) -> dict:
+        """Drop-in replacement for runner.run_engine that uses the pooled engine."""
+        if self._proc is None:
+            return run_engine(json_input)
+        if isinstance(json_input, str):
+            json_input = json_input.encode()
+        elif callable(json_input):
+            # A frame needs its length up front, so stream into memory first.
+            fp = io.BytesIO()
+            json_input(fp)
+            json_input = fp.getvalue()
+
+        with self._lock:
+            proc = self._proc
+            try:
+                proc.stdin.write(_FRAME_HEADER.pack(len(json_input)))
+                proc.stdin.write(json_input)
+                proc.stdin.flush()
+            except BrokenPipeError:
+                pass  # the engine has exited; reported when reading below
+            header = proc.stdout.read(_FRAME_HEADER.size)
+            if len(header) < _FRAME_HEADER.size:
+                raise RuntimeError(
+                    f"tms-engine server exited with code {proc.wait()} mid-request"
+                )
+            (size,) = _FRAME_HEADER.unpack(header)
+            response = orjson.loads(proc.stdout.read(size))
+
+        if "error" in response:
+            raise RuntimeError(f"tms-engine reported an error:\n{response['error']}")
+        return response
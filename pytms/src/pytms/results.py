@@ -1,8 +1,29 @@
+from functools import cached_property
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pyarrow as pa
+
+
+def _require(module: str) -> Any:
+    """Import an optional dependency of the columnar accessors."""
+    try:
+        return import_module(module)
+    except ImportError as e:
+        raise ImportError(
+            f"{module} is required for columnar results; "
+            "install it with: pip install 'pytms[arrow]'"
+        ) from e
+
+
 class SimulationResult:
     """Wraps the raw JSON output from tms-engine.
 
-    Provides dict-style access right now, probably
-    in future will do something like pandas df.
+    Provides dict-style access via output and to_dict, plus columnar access via
+    as_arrow, timestamps and service_positions (requires pytms[arrow]). Prefer
+    the columnar accessors for analysis over many timesteps.
     """
 
     def __init__(self, raw: dict):
@@ -16,6 +37,54 @@ class SimulationResult:
     def output(self) -> list[dict]:
         return self._raw["output"]
 
+    @cached_property
+    def as_arrow(self) -> "pa.Table":
+        """The output as a pyarrow Table with one row per timestep.
+
+        Columns are timestamp and service_logs, a list of structs mirroring the
+        dicts in output. Built on first access and then reused.
+        """
+        pa = _require("pyarrow")
+        return pa.Table.from_pylist(self.output)
+
+    @property
+    def timestamps(self) -> "np.ndarray":
+        """The timestamp of every timestep as a float64 array."""
+        np = _require("numpy")
+        pa = _require("pyarrow")
+        table = self.as_arrow
+        if "timestamp" not in table.column_names:
+            # Only an empty output has no columns at all.
+            return np.full(table.num_rows, np.nan)
+        return table.column("timestamp").cast(pa.float64()).to_numpy()
+
+    def service_positions(self, service_id: str) -> "np.ndarray":
+        """Distance along the current edge of service_id at every timestep.
+
+        The array lines up with timestamps; steps where the service is not
+        logged are NaN. The edge itself is in the service_logs column of
+        as_arrow.
+        """
+        np = _require("numpy")
+        pa = _require("pyarrow")
+        pc = _require("pyarrow.compute")
+        table = self.as_arrow
+        positions = np.full(table.num_rows, np.nan)
+        if "service_logs" not in table.column_names:
+            return positions
+        logs = table.column("service_logs").combine_chunks()
+        # A run without services logs only empty lists, which Arrow types as
+        # list<null>: there are no structs to look into.
+        item_type = getattr(logs.type, "value_type", None)
+        if item_type is None or not pa.types.is_struct(item_type):
+            return positions
+        flat = pc.list_flatten(logs)
+        mask = pc.equal(pc.struct_field(flat, "service_id"), service_id)
+        rows = pc.filter(pc.list_parent_indices(logs), mask)
+        dist = pc.struct_field(flat, ["current_position", "distance_along_edge"])
+        positions[rows.to_numpy()] = pc.filter(dist, mask).cast(pa.float64()).to_numpy()
+        return positions
+
     def to_dict(self) -> dict:
         return self._raw
 
@@ -1,9 +1,21 @@
-import json
+import asyncio
+import contextlib
+import functools
+import mmap
+import os
 import platform
 import shutil
 import subprocess
+import tempfile
+from collections.abc import Callable
 from importlib import resources
 from pathlib import Path
+from typing import IO
+
+import orjson
+
+# tmpfs directory for engine output files; RAM-backed on Linux.
+_SHM_DIR = "/dev/shm"
 
 
 def _platform_binary_name() -> str:
@@ -21,18 +33,25 @@ def _platform_binary_name() -> str:
         return f"tms-engine-linux-{arch}"
 
 
+@functools.lru_cache(maxsize=1)
 def _find_binary() -> Path:
     """Locate the tms-engine binary.
 
     Search order:
     1. Bundled binary inside the installed package (production).
     2. 'tms-engine' on PATH (development: make cli).
+
+    The result is cached for the life of the process; see _reset_binary_cache.
     """
     # 1. Bundled binary (present in installed wheels).
     try:
         bin_ref = resources.files("pytms") / "bin" / _platform_binary_name()
         p = Path(str(bin_ref))
         if p.is_file():
+            # Wheels can lose the executable bit; only touch the file when it
+            # is actually missing, so read-only installs keep working.
+            if not os.access(p, os.X_OK):
+                p.chmod(p.stat().st_mode | 0o111)
             return p
     except (TypeError, FileNotFoundError, NotADirectoryError, ModuleNotFoundError):
         pass
@@ -50,18 +69,153 @@ def _find_binary() -> Path:
     )
 
 
-def run_engine(json_input: str) -> dict:
-    """Pass json_input to the tms-engine binary and return the parsed JSON output."""
-    binary = _find_binary()
-    binary.chmod(binary.stat().st_mode | 0o111)  # ensure executable bit is set
+@functools.lru_cache(maxsize=1)
+def _engine_capabilities() -> frozenset[str]:
+    """Return the optional protocol features the engine advertises.
+
+    Engines print a JSON list of feature names for --capabilities. Older engines
+    treat the flag as an input file path and fail, so they advertise nothing.
+    The probe costs an engine process, so it is only made by callers that can
+    use one of the features.
+    """
     result = subprocess.run(
-        [str(binary)],
-        input=json_input,
+        [str(_find_binary()), "--capabilities"],
+        stdin=subprocess.DEVNULL,
         capture_output=True,
-        text=True,
     )
     if result.returncode != 0:
-        raise RuntimeError(
-            f"tms-engine exited with code {result.returncode}:\n{result.stderr.strip()}"
+        return frozenset()
+    try:
+        capabilities = orjson.loads(result.stdout)
+    except orjson.JSONDecodeError:
+        return frozenset()
+    if not isinstance(capabilities, list):
+        return frozenset()
+    return frozenset(capabilities)
+
+
+def _reset_binary_cache() -> None:
+    """Forget the cached binary location and engine capabilities."""
+    _find_binary.cache_clear()
+    _engine_capabilities.cache_clear()
+
+
+def run_engine(
+    json_input: bytes | str | Callable[[IO[bytes]], None],
+    shared_memory: bool = False,
+) -> dict:
+    """Pass json_input to the tms-engine binary and return the parsed JSON output.
+
+    json_input is either the serialized payload or a callback that writes it to
+    the engine's stdin, which lets the payload be streamed rather than built up
+    in memory first. The pipes are kept in binary mode so the output is parsed
+    by orjson straight from bytes, without decoding it to a str first.
+
+    With shared_memory, an engine that can write its output to a file is given
+    one in /dev/shm, which is then parsed in place through mmap rather than
+    copied through the stdout pipe. This pays off for large outputs, but checks
+    the engine's capabilities with an extra engine process on first use.
+    """
+    if isinstance(json_input, str):
+        json_input = json_input.encode()
+    args = [str(_find_binary())]
+    out = _shared_memory_file() if shared_memory else None
+    if out is None:
+        return _parse_output(*_communicate(args, json_input))
+    with out:
+        returncode, _, stderr = _communicate(
+            [*args, "--output-path", out.name], json_input
         )
-    return json.loads(result.stdout)
+        _check_exit(returncode, stderr)
+        return _load_mapped(out)
+
+
+def _communicate(
+    args: list[str], json_input: bytes | Callable[[IO[bytes]], None]
+) -> tuple[int, bytes, bytes]:
+    """Run the engine on json_input; return its exit code, stdout and stderr."""
+    # Leave preexec_fn, cwd, env and close_fds at their defaults: on Linux that
+    # keeps CPython on its vfork-based spawn, which does not copy the parent's
+    # address space however large it is.
+    proc = subprocess.Popen(
+        args,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    if callable(json_input):
+        # The engine reads all of stdin before writing anything, so writing the
+        # whole payload ahead of communicate() cannot deadlock on a full pipe.
+        try:
+            json_input(proc.stdin)
+        except BrokenPipeError:
+            pass  # the engine exited early; report its stderr below
+        except BaseException:
+            proc.kill()
+            proc.communicate()
+            raise
+        stdout, stderr = proc.communicate()
+    else:
+        stdout, stderr = proc.communicate(json_input)
+    return proc.returncode, stdout, stderr
+
+
+def _shared_memory_file() -> IO[bytes] | None:
+    """Return a temporary file in /dev/shm for the engine to write its output to.
+
+    Returns None, so the output comes over stdout, when the engine cannot write
+    to a file or there is no /dev/shm (i.e. not on Linux).
+    """
+    if "output_path" not in _engine_capabilities() or not os.path.isdir(_SHM_DIR):
+        return None
+    return tempfile.NamedTemporaryFile(dir=_SHM_DIR, prefix="pytms-", suffix=".json")
+
+
+def _load_mapped(f: IO[bytes]) -> dict:
+    """Parse the JSON in f in place through a read-only memory map."""
+    if os.fstat(f.fileno()).st_size == 0:
+        raise RuntimeError("tms-engine exited successfully but wrote no output")
+    with (
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+        memoryview(mm) as view,
+    ):
+        return orjson.loads(view)
+
+
+async def run_engine_async(json_input: bytes | str) -> dict:
+    """Async version of run_engine for a payload that is already serialized.
+
+    The engine runs as an asyncio subprocess, so many runs can be in flight at
+    once without tying up a thread each. It is killed if the call is cancelled.
+    """
+    if isinstance(json_input, str):
+        json_input = json_input.encode()
+    binary = _find_binary()
+    proc = await asyncio.create_subprocess_exec(
+        str(binary),
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await proc.communicate(json_input)
+    except BaseException:
+        # Cancelled, e.g. by a timeout or a failed gather: do not leave the
+        # engine running unobserved.
+        with contextlib.suppress(ProcessLookupError):
+            proc.kill()
+        await proc.wait()
+        raise
+    return _parse_output(proc.returncode, stdout, stderr)
+
+
+def _parse_output(returncode: int, stdout: bytes, stderr: bytes) -> dict:
+    """Parse the engine's stdout, or raise with its stderr if it failed."""
+    _check_exit(returncode, stderr)
+    return orjson.loads(stdout)
+
+
+def _check_exit(returncode: int, stderr: bytes) -> None:
+    if returncode != 0:
+        stderr = stderr.decode(errors="replace").strip()
+        raise RuntimeError(f"tms-engine exited with code {returncode}:\n{stderr}")
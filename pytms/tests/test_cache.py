@@ -0,0 +1,58 @@
+import pytest
+
+from pytms import cache, clear_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_cache()
+    yield
+    clear_cache()
+
+
+def _payload(simulation_id: str = "x", run_time: float = 300.0) -> dict:
+    return {
+        "simulation_meta": {
+            "simulation_id": simulation_id,
+            "run_time": run_time,
+            "time_step": 1.0,
+        },
+        "graph_data": {"nodes": [{"node_id": "A"}], "edges": []},
+        "service_list": [],
+    }
+
+
+class TestPayloadKey:
+    def test_ignores_simulation_id(self):
+        assert cache._payload_key(_payload("a")) == cache._payload_key(_payload("b"))
+
+    def test_depends_on_inputs(self):
+        key = cache._payload_key(_payload(run_time=300.0))
+        assert key != cache._payload_key(_payload(run_time=600.0))
+
+    def test_ignores_key_order(self):
+        payload = _payload()
+        reordered = dict(reversed(list(payload.items())))
+        assert cache._payload_key(payload) == cache._payload_key(reordered)
+
+
+class TestCache:
+    def test_miss_returns_none(self):
+        assert cache._get(b"missing") is None
+
+    def test_put_then_get(self):
+        cache._put(b"k", {"output": []})
+        assert cache._get(b"k") == {"output": []}
+
+    def test_evicts_least_recently_used(self):
+        for i in range(cache._MAX_ENTRIES):
+            cache._put(bytes([i]), {"i": i})
+        cache._get(bytes([0]))  # refresh the oldest entry
+        cache._put(b"new", {})
+        assert cache._get(bytes([0])) is not None
+        assert cache._get(bytes([1])) is None
+
+    def test_clear_cache(self):
+        cache._put(b"k", {})
+        clear_cache()
+        assert cache._get(b"k") is None
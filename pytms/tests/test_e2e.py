@@ -1,8 +1,20 @@
+import asyncio
 import shutil
+import subprocess
+from unittest.mock import patch
 
 import pytest
 
-from pytms import Network, RouteStop, Service, Vehicle
+from pytms import (
+    EnginePool,
+    IGraphNetwork,
+    Network,
+    RouteStop,
+    RunConfig,
+    Service,
+    Vehicle,
+)
+from pytms.runner import _engine_capabilities
 
 pytestmark = pytest.mark.e2e
 
@@ -44,3 +56,56 @@ class TestE2E:
         first_row = result.output[0]
         service_ids = [s["service_id"] for s in first_row["service_logs"]]
         assert "S1" in service_ids
+
+    def test_run_many_returns_one_result_per_config(self, two_node_network):
+        configs = [RunConfig(100.0, simulation_id="a"), RunConfig(200.0)]
+        results = two_node_network.run_many(configs)
+        assert [len(r.output) for r in results] == [101, 201]
+        assert results[0].meta["simulation_id"] == "a"
+
+    def test_run_many_is_one_engine_invocation(self, two_node_network):
+        assert "batch" in _engine_capabilities()  # probed outside the count below
+        configs = [RunConfig(100.0, simulation_id="a"), RunConfig(200.0, 2.0, "b")]
+        with patch("subprocess.Popen", wraps=subprocess.Popen) as popen:
+            results = two_node_network.run_many(configs)
+        assert popen.call_count == 1
+        assert [r.meta["simulation_id"] for r in results] == ["a", "b"]
+        assert [len(r.output) for r in results] == [101, 101]
+
+    def test_run_with_shared_memory(self, two_node_network):
+        result = two_node_network.run(run_time=100.0, shared_memory=True)
+        assert result.output == two_node_network.run(run_time=100.0).output
+
+    def test_run_sweep_returns_one_result_per_config(self, two_node_network):
+        configs = [RunConfig(100.0, simulation_id="a"), RunConfig(200.0)]
+        results = two_node_network.run_sweep(configs, workers=2)
+        assert [len(r.output) for r in results] == [101, 201]
+        assert results[0].meta["simulation_id"] == "a"
+
+    def test_run_async(self, two_node_network):
+        result = asyncio.run(two_node_network.run_async(run_time=300.0))
+        assert len(result.output) == 301
+
+    def test_run_sweep_async(self, two_node_network):
+        configs = [RunConfig(100.0), RunConfig(200.0)]
+        results = asyncio.run(two_node_network.run_sweep_async(configs))
+        assert [len(r.output) for r in results] == [101, 201]
+
+    def test_igraph_network_run(self, two_node_network):
+        pytest.importorskip("igraph")
+        net = IGraphNetwork.from_edges(
+            [
+                {"u": "A", "v": "B", "length": 1000.0},
+                {"u": "B", "v": "A", "length": 1000.0},
+            ]
+        )
+        for svc in two_node_network._services:
+            net.add_service(svc)
+        result = net.run(run_time=300.0, time_step=1.0)
+        expected = two_node_network.run(run_time=300.0, time_step=1.0)
+        assert result.output == expected.output
+
+    def test_run_with_engine_pool(self, two_node_network):
+        with EnginePool() as pool:
+            result = two_node_network.run(run_time=300.0, pool=pool)
+        assert len(result.output) == 301
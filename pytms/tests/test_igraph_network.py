@@ -0,0 +1,100 @@
+import pytest
+
+from pytms import IGraphNetwork, Network, RouteStop, Service, Vehicle
+
+pytest.importorskip("igraph")
+
+
+@pytest.fixture
+def service():
+    vehicle = Vehicle(name="Train", length=50.0, v_max=20.0, a_acc=0.5, a_dcc=0.7)
+    return Service("S1", vehicle, "A", [RouteStop("B", 30.0), RouteStop("A", 30.0)])
+
+
+EDGES = [
+    {"u": "A", "v": "B", "length": 1000.0},
+    {"u": "B", "v": "A", "length": 1000.0, "speed_limit": 10.0},
+]
+
+
+class TestIGraphNetworkBuild:
+    def test_add_edge_creates_nodes(self):
+        net = IGraphNetwork()
+        net.add_edge("A", "B", length=1000.0)
+        assert net.has_node("A")
+        assert net.has_node("B")
+        assert net.graph.ecount() == 1
+
+    def test_add_node_is_idempotent(self):
+        net = IGraphNetwork()
+        net.add_node("A")
+        net.add_node("A")
+        assert net.graph.vcount() == 1
+
+    def test_add_edge_updates_existing_edge(self):
+        net = IGraphNetwork()
+        net.add_edge("A", "B", length=1000.0)
+        net.add_edge("A", "B", length=2.0, speed_limit=5.0)
+        assert net.graph.ecount() == 1
+        assert net.graph.es[0]["length"] == 2.0
+        assert net.graph.es[0]["speed_limit"] == 5.0
+
+    def test_from_edges_drops_endpoint_attributes(self):
+        net = IGraphNetwork.from_edges(EDGES, nodes=["A", "B", "C"])
+        assert net.graph.vs["name"] == ["A", "B", "C"]
+        assert set(net.graph.es.attributes()) == {"length", "speed_limit"}
+
+    def test_rejects_undirected_graph(self):
+        import igraph as ig
+
+        graph = ig.Graph(edges=[(0, 1)], directed=False)
+        graph.vs["name"] = ["A", "B"]
+        with pytest.raises(ValueError, match="directed graph"):
+            IGraphNetwork(graph)
+
+    def test_rejects_unnamed_vertices(self):
+        import igraph as ig
+
+        with pytest.raises(ValueError, match="'name' attribute"):
+            IGraphNetwork(ig.Graph(n=2, edges=[(0, 1)], directed=True))
+        graph = ig.Graph(directed=True)
+        graph.add_vertex(name="A")
+        graph.add_vertices(1)
+        with pytest.raises(ValueError, match="'name' attribute"):
+            IGraphNetwork(graph)
+
+
+class TestIGraphBuildEngineInput:
+    def test_matches_networkx_network(self, service):
+        inet = IGraphNetwork.from_edges(EDGES)
+        inet.add_service(service)
+        net = Network()
+        for e in EDGES:
+            net.add_edge(e["u"], e["v"], **{k: e[k] for k in e if k not in ("u", "v")})
+        net.add_service(service)
+        expected = net._build_engine_input("x", 300.0, 1.0)
+        assert inet._build_engine_input("x", 300.0, 1.0) == expected
+
+    def test_speed_limit_omitted_when_unset(self):
+        net = IGraphNetwork()
+        net.add_edge("A", "B", length=500.0)
+        payload = net._build_engine_input("x", 300.0, 1.0)
+        assert payload["graph_data"]["edges"] == [
+            {"edge_id": "A->B", "u": "A", "v": "B", "length": 500.0}
+        ]
+
+    def test_missing_length_raises(self):
+        net = IGraphNetwork()
+        net.add_edge("A", "B", length=500.0)
+        net.add_edge("B", "A")
+        with pytest.raises(ValueError, match="missing required attribute 'length'"):
+            net._validate()
+
+    def test_parallel_edges_raise(self):
+        net = IGraphNetwork.from_edges(EDGES + [EDGES[0]])
+        with pytest.raises(ValueError, match=r"Parallel edges .*\('A', 'B'\)"):
+            net._validate()
+
+    def test_empty_network(self):
+        payload = IGraphNetwork()._build_engine_input("x", 300.0, 1.0)
+        assert payload["graph_data"] == {"nodes": [], "edges": []}
@@ -1,6 +1,9 @@
+from dataclasses import FrozenInstanceError
+
+import orjson
 import pytest
 
-from pytms import RouteStop, Service, Vehicle
+from pytms import RouteStop, RunConfig, Service, Vehicle
 
 
 @pytest.fixture
@@ -28,6 +31,14 @@ class TestVehicle:
         assert d["kinematics"]["a_acc"] == 0.5
         assert d["kinematics"]["a_dcc"] == 0.7
 
+    def test_engine_dict_built_once(self, vehicle):
+        assert vehicle._engine_dict is vehicle._engine_dict
+        assert vehicle._engine_dict == vehicle._to_engine_dict()
+
+    def test_is_frozen(self, vehicle):
+        with pytest.raises(FrozenInstanceError):
+            vehicle.v_max = 30.0
+
 
 class TestRouteStop:
     def test_defaults_to_zero_dwell(self):
@@ -46,9 +57,20 @@ class TestService:
         assert d["service_id"] == "S1"
         assert d["initial_position"] == "A"
         assert len(d["route"]) == 2
-        assert d["route"][0] == {"node_id": "B", "t_dwell": 30.0}
-        assert d["route"][1] == {"node_id": "A", "t_dwell": 30.0}
-        assert "vehicle" in d
+        assert d["route"] == (RouteStop("B", 30.0), RouteStop("A", 30.0))
+        assert d["vehicle"] is service.vehicle._engine_dict
+
+    def test_route_encodes_to_engine_shape(self, service):
+        route = orjson.loads(orjson.dumps(service._to_engine_dict()))["route"]
+        assert route == [
+            {"node_id": "B", "t_dwell": 30.0},
+            {"node_id": "A", "t_dwell": 30.0},
+        ]
+
+    def test_route_stored_as_tuple(self, service):
+        assert service.route == (RouteStop("B", 30.0), RouteStop("A", 30.0))
+        with pytest.raises(AttributeError):
+            service.route.append(RouteStop("A", 9.0))
 
     def test_departure_delay_omitted_when_zero(self, service):
         d = service._to_engine_dict()
@@ -58,3 +80,10 @@ class TestService:
         svc = Service("S2", vehicle, "A", [RouteStop("B")], departure_delay=60.0)
         d = svc._to_engine_dict()
         assert d["departure_delay"] == 60.0
+
+
+class TestRunConfig:
+    def test_defaults(self):
+        cfg = RunConfig(300.0)
+        assert cfg.time_step == 1.0
+        assert cfg.simulation_id is None
@@ -1,6 +1,18 @@
+import asyncio
+import io
+from unittest.mock import patch
+
+import networkx as nx
+import orjson
 import pytest
 
-from pytms import Network, RouteStop, Service, Vehicle
+from pytms import Network, RouteStop, RunConfig, Service, Vehicle, clear_cache
+from pytms.network import _ARRAY_CHUNK_SIZE, _config_payload, _NetworkBase
+
+
+def _as_json(payload: dict) -> dict:
+    """Round-trip payload through orjson, as the engine would receive it."""
+    return orjson.loads(orjson.dumps(payload))
 
 
 @pytest.fixture
@@ -22,8 +34,6 @@ def simple_network(vehicle):
 
 class TestNetworkBuild:
     def test_is_digraph(self, simple_network):
-        import networkx as nx
-
         assert isinstance(simple_network, nx.DiGraph)
 
     def test_nodes_present(self, simple_network):
@@ -33,6 +43,14 @@ class TestNetworkBuild:
     def test_edge_attributes(self, simple_network):
         assert simple_network.edges["A", "B"]["length"] == 1000.0
 
+    def test_backend_must_provide_records(self):
+        class Incomplete(_NetworkBase):
+            def _engine_nodes(self):
+                return iter(())
+
+        with pytest.raises(TypeError, match="_engine_edges"):
+            Incomplete()
+
     def test_speed_limit_optional(self):
         net = Network()
         net.add_node("A")
@@ -61,6 +79,16 @@ class TestBuildEngineInput:
         assert edges["A->B"]["length"] == 1000.0
         assert "speed_limit" not in edges["A->B"]
 
+    def test_order_matches_networkx_views(self):
+        net = Network()
+        nx.add_path(net, ["C", "A", "B", "D"], length=10.0)
+        net.add_edge("D", "A", length=5.0)
+        payload = net._build_engine_input("x", 300.0, 1.0)
+        assert [n["node_id"] for n in payload["graph_data"]["nodes"]] == list(net.nodes)
+        assert [(e["u"], e["v"]) for e in payload["graph_data"]["edges"]] == list(
+            net.edges
+        )
+
     def test_speed_limit_included_when_set(self):
         net = Network()
         net.add_node("A")
@@ -76,9 +104,312 @@ class TestBuildEngineInput:
         net.add_node("B")
         net.add_edge("A", "B")  # no length
         with pytest.raises(ValueError, match="missing required attribute 'length'"):
-            net._build_engine_input("x", 300.0, 1.0)
+            net._validate()
+
+    def test_reports_every_missing_length(self):
+        net = Network()
+        net.add_edge("A", "B")
+        net.add_edge("B", "C", length=500.0)
+        net.add_edge("C", "A")
+        with pytest.raises(ValueError, match="2 edges are missing") as excinfo:
+            net._validate()
+        assert "('A', 'B')" in str(excinfo.value)
+        assert "('C', 'A')" in str(excinfo.value)
+
+    def test_truncates_long_missing_length_report(self):
+        net = Network()
+        nx.add_path(net, range(15))
+        with pytest.raises(ValueError, match=r"14 edges .* and 4 more$"):
+            net._validate()
+
+    def test_none_length_treated_as_missing(self):
+        net = Network()
+        net.add_edge("A", "B", length=None)
+        with pytest.raises(ValueError, match="missing required attribute 'length'"):
+            net._validate()
+
+    def test_duplicate_edge_ids_raise(self):
+        net = Network()
+        net.add_edge(1, 2, length=100.0)
+        net.add_edge("1", "2", length=100.0)
+        with pytest.raises(ValueError, match="Edge ids must be unique.*'1->2'"):
+            net._validate()
+
+    @pytest.mark.parametrize(
+        "run",
+        [
+            lambda net: net.run(300.0),
+            lambda net: net.run(300.0, cache=True),
+            lambda net: net.run_many([RunConfig(300.0)]),
+            lambda net: net.run_sweep([RunConfig(300.0)]),
+            lambda net: asyncio.run(net.run_async(300.0)),
+            lambda net: asyncio.run(net.run_sweep_async([RunConfig(300.0)])),
+        ],
+    )
+    def test_invalid_edges_rejected_before_engine_starts(self, run):
+        net = Network()
+        net.add_edge("A", "B")  # no length
+        with (
+            patch("subprocess.Popen") as popen,
+            patch("asyncio.create_subprocess_exec") as create_subprocess,
+            pytest.raises(ValueError, match="missing required attribute 'length'"),
+        ):
+            run(net)
+        popen.assert_not_called()
+        create_subprocess.assert_not_called()
+
+    def test_unknown_service_node_raises(self, simple_network, vehicle):
+        simple_network.add_service(Service("S2", vehicle, "A", [RouteStop("Z", 30.0)]))
+        with pytest.raises(ValueError, match="unknown nodes: 'Z' \\(service 'S2'\\)"):
+            simple_network._validate()
+
+    def test_removed_service_node_raises(self, simple_network):
+        simple_network._validate()
+        simple_network.remove_node("B")
+        with pytest.raises(ValueError, match="unknown nodes: 'B'"):
+            simple_network._validate()
+
+    @pytest.mark.parametrize(
+        ("make_invalid", "match"),
+        [
+            (
+                lambda net, vehicle: net.add_service(
+                    Service("S2", vehicle, "A", [RouteStop("Z", 30.0)])
+                ),
+                "unknown nodes: 'Z'",
+            ),
+            (
+                lambda net, vehicle: net.add_edges_from(
+                    [("A", "B->C"), ("A->B", "C")], length=1.0
+                ),
+                "Edge ids must be unique.*'A->B->C'",
+            ),
+        ],
+    )
+    def test_invalid_network_rejected_before_engine_starts(
+        self, simple_network, vehicle, make_invalid, match
+    ):
+        make_invalid(simple_network, vehicle)
+        with (
+            patch("subprocess.Popen") as popen,
+            pytest.raises(ValueError, match=match),
+        ):
+            simple_network.run(300.0)
+        popen.assert_not_called()
 
     def test_service_list(self, simple_network):
         payload = simple_network._build_engine_input("x", 300.0, 1.0)
         assert len(payload["service_list"]) == 1
         assert payload["service_list"][0]["service_id"] == "S1"
+
+
+class TestRunCache:
+    @pytest.fixture(autouse=True)
+    def empty_cache(self):
+        clear_cache()
+        yield
+        clear_cache()
+
+    def _engine_output(self, json_input):
+        payload = orjson.loads(json_input)
+        return {"simulation_meta": payload["simulation_meta"], "output": []}
+
+    def test_cached_rerun_skips_engine(self, simple_network):
+        with patch(
+            "pytms.network.run_engine", side_effect=self._engine_output
+        ) as mock_run:
+            first = simple_network.run(300.0, cache=True)
+            second = simple_network.run(300.0, simulation_id="again", cache=True)
+        mock_run.assert_called_once()
+        assert second.meta["simulation_id"] == "again"
+        assert second.output is first.output
+
+    def test_changed_inputs_miss(self, simple_network):
+        with patch(
+            "pytms.network.run_engine", side_effect=self._engine_output
+        ) as mock_run:
+            simple_network.run(300.0, cache=True)
+            simple_network.run(600.0, cache=True)
+        assert mock_run.call_count == 2
+
+    def test_generates_simulation_id(self, simple_network):
+        with patch(
+            "pytms.network.run_engine", side_effect=self._engine_output
+        ) as mock_run:
+            first = simple_network.run(300.0, cache=True)
+            clear_cache()
+            second = simple_network.run(300.0, cache=True)
+        assert mock_run.call_count == 2
+        sim_id = first.meta["simulation_id"]
+        assert len(sim_id) == 32 and int(sim_id, 16) >= 0
+        assert sim_id != second.meta["simulation_id"]
+
+    def test_uncached_runs_always_invoke_engine(self, simple_network):
+        with patch(
+            "pytms.network.run_engine",
+            return_value={"simulation_meta": {}, "output": []},
+        ) as mock_run:
+            simple_network.run(300.0)
+            simple_network.run(300.0)
+        assert mock_run.call_count == 2
+
+    def test_shared_memory_passed_to_engine(self, simple_network):
+        with patch(
+            "pytms.network.run_engine",
+            return_value={"simulation_meta": {}, "output": []},
+        ) as mock_run:
+            simple_network.run(300.0, shared_memory=True)
+        assert mock_run.call_args.kwargs == {"shared_memory": True}
+
+
+class TestRunMany:
+    def test_empty_configs(self, simple_network):
+        assert simple_network.run_many([]) == []
+
+    def test_falls_back_to_sequential_runs(self, simple_network):
+        configs = [RunConfig(300.0, simulation_id="a"), RunConfig(600.0, 2.0)]
+        with (
+            patch("pytms.network._engine_capabilities", return_value=frozenset()),
+            patch.object(simple_network, "run") as mock_run,
+        ):
+            results = simple_network.run_many(configs)
+        assert mock_run.call_args_list == [
+            ((300.0, 1.0, "a"),),
+            ((600.0, 2.0, None),),
+        ]
+        assert len(results) == 2
+
+    def test_batches_into_one_engine_call(self, simple_network):
+        def engine(write_payload):
+            fp = io.BytesIO()
+            write_payload(fp)
+            batch = orjson.loads(fp.getvalue())["simulation_batch"]
+            logs = [{"simulation_meta": meta, "output": []} for meta in batch]
+            return {"simulation_batch": logs}
+
+        configs = [RunConfig(300.0, simulation_id="a"), RunConfig(600.0, 2.0)]
+        with (
+            patch("pytms.network._engine_capabilities", return_value={"batch"}),
+            patch("pytms.network.run_engine", side_effect=engine) as mock_run,
+        ):
+            results = simple_network.run_many(configs)
+        mock_run.assert_called_once()
+        assert results[0].meta["simulation_id"] == "a"
+        assert results[1].meta["run_time"] == 600.0
+        assert results[1].meta["time_step"] == 2.0
+
+
+class TestRunSweep:
+    def _engine_output(self, json_input):
+        payload = orjson.loads(json_input)
+        return {"simulation_meta": payload["simulation_meta"], "output": []}
+
+    def test_results_in_config_order(self, simple_network):
+        configs = [RunConfig(float(t), simulation_id=str(t)) for t in range(1, 9)]
+        with patch("pytms.network.run_engine", side_effect=self._engine_output):
+            results = simple_network.run_sweep(configs, workers=4)
+        assert [r.meta["simulation_id"] for r in results] == [
+            str(t) for t in range(1, 9)
+        ]
+
+    def test_payload_matches_built_input(self, simple_network):
+        with patch("pytms.network.run_engine", return_value={}) as mock_run:
+            simple_network.run_sweep([RunConfig(300.0, simulation_id="x")])
+        sent = orjson.loads(mock_run.call_args.args[0])
+        assert sent == _as_json(simple_network._build_engine_input("x", 300.0, 1.0))
+
+
+class TestRunAsync:
+    async def _engine_output(self, json_input):
+        payload = orjson.loads(json_input)
+        return {"simulation_meta": payload["simulation_meta"], "output": []}
+
+    def test_run_async_sends_built_input(self, simple_network):
+        with patch(
+            "pytms.network.run_engine_async", side_effect=self._engine_output
+        ) as mock_run:
+            result = asyncio.run(simple_network.run_async(300.0, simulation_id="x"))
+        sent = orjson.loads(mock_run.call_args.args[0])
+        assert sent == _as_json(simple_network._build_engine_input("x", 300.0, 1.0))
+        assert result.meta["simulation_id"] == "x"
+
+    def test_run_sweep_async_keeps_config_order(self, simple_network):
+        configs = [RunConfig(float(t), simulation_id=str(t)) for t in range(1, 9)]
+        with patch("pytms.network.run_engine_async", side_effect=self._engine_output):
+            results = asyncio.run(simple_network.run_sweep_async(configs, workers=2))
+        assert [r.meta["simulation_id"] for r in results] == [
+            str(t) for t in range(1, 9)
+        ]
+
+    def test_run_sweep_async_builds_payloads_per_worker(self, simple_network):
+        built, done, held = [], [], []
+
+        def config_payload(cfg, scenario):
+            built.append(cfg)
+            return _config_payload(cfg, scenario)
+
+        async def engine(json_input):
+            await asyncio.sleep(0)
+            held.append(len(built) - len(done))
+            done.append(json_input)
+            return await self._engine_output(json_input)
+
+        configs = [RunConfig(float(t)) for t in range(1, 9)]
+        with (
+            patch("pytms.network._config_payload", side_effect=config_payload),
+            patch("pytms.network.run_engine_async", side_effect=engine),
+        ):
+            asyncio.run(simple_network.run_sweep_async(configs, workers=2))
+        assert max(held) <= 2
+
+
+class TestScenarioCache:
+    def _scenario(self, net):
+        fp = io.BytesIO()
+        net._write_engine_input("x", 300.0, 1.0, fp)
+        return orjson.loads(fp.getvalue())
+
+    @pytest.mark.parametrize(
+        "change",
+        [
+            lambda net: net.add_edge("B", "C", length=10.0),
+            lambda net: net.add_edge("A", "B", length=1.0),
+            lambda net: net.remove_edge("B", "A"),
+            lambda net: nx.set_edge_attributes(net, 5.0, "speed_limit"),
+            lambda net: net.edges["A", "B"].update(length=1.0, speed_limit=5.0),
+        ],
+    )
+    def test_graph_changes_are_sent(self, simple_network, change):
+        self._scenario(simple_network)
+        change(simple_network)
+        payload = self._scenario(simple_network)
+        assert payload == _as_json(simple_network._build_engine_input("x", 300.0, 1.0))
+
+    def test_add_service_invalidates(self, simple_network, vehicle):
+        self._scenario(simple_network)
+        simple_network.add_service(Service("S2", vehicle, "B", [RouteStop("A")]))
+        payload = self._scenario(simple_network)
+        assert [s["service_id"] for s in payload["service_list"]] == ["S1", "S2"]
+
+
+class TestWriteEngineInput:
+    def test_matches_built_input(self, simple_network):
+        fp = io.BytesIO()
+        simple_network._write_engine_input("x", 300.0, 1.0, fp)
+        expected = _as_json(simple_network._build_engine_input("x", 300.0, 1.0))
+        assert orjson.loads(fp.getvalue()) == expected
+
+    def test_spans_several_chunks(self):
+        net = Network()
+        nx.add_path(net, range(_ARRAY_CHUNK_SIZE * 2 + 2), length=10.0)
+        fp = io.BytesIO()
+        net._write_engine_input("x", 300.0, 1.0, fp)
+        expected = _as_json(net._build_engine_input("x", 300.0, 1.0))
+        assert orjson.loads(fp.getvalue()) == expected
+
+    def test_empty_network(self):
+        fp = io.BytesIO()
+        Network()._write_engine_input("x", 300.0, 1.0, fp)
+        payload = orjson.loads(fp.getvalue())
+        assert payload["graph_data"] == {"nodes": [], "edges": []}
+        assert payload["service_list"] == []
@@ -0,0 +1,81 @@
+import sys
+from unittest.mock import patch
+
+import orjson
+import pytest
+
+from pytms import EnginePool, Network
+
+# A stand-in for 'tms-engine --serve' that echoes each payload's meta back.
+FAKE_SERVER = f"""#!{sys.executable}
+import json, struct, sys
+
+while header := sys.stdin.buffer.read(8):
+    (size,) = struct.unpack("<Q", header)
+    payload = json.loads(sys.stdin.buffer.read(size))
+    meta = payload["simulation_meta"]
+    if meta["run_time"] < 0:
+        response = {{"error": "negative run_time"}}
+    else:
+        response = {{"simulation_meta": meta, "output": []}}
+    body = json.dumps(response).encode()
+    sys.stdout.buffer.write(struct.pack("<Q", len(body)) + body)
+    sys.stdout.buffer.flush()
+"""
+
+
+@pytest.fixture
+def network():
+    net = Network()
+    net.add_edge("A", "B", length=1000.0)
+    return net
+
+
+@pytest.fixture
+def fake_server(tmp_path):
+    script = tmp_path / "tms-engine"
+    script.write_text(FAKE_SERVER)
+    script.chmod(0o755)
+    with (
+        patch("pytms.pool._find_binary", return_value=script),
+        patch("pytms.pool._engine_capabilities", return_value={"serve"}),
+    ):
+        yield script
+
+
+class TestEnginePoolServe:
+    def test_runs_share_one_process(self, network, fake_server):
+        with EnginePool() as pool:
+            proc = pool._proc
+            first = network.run(300.0, simulation_id="a", pool=pool)
+            second = network.run(600.0, simulation_id="b", pool=pool)
+            assert pool._proc is proc
+        assert first.meta["simulation_id"] == "a"
+        assert second.meta["run_time"] == 600.0
+        assert proc.returncode == 0
+
+    def test_error_response_raises(self, network, fake_server):
+        with EnginePool() as pool:
+            with pytest.raises(RuntimeError, match="negative run_time"):
+                network.run(-1.0, pool=pool)
+            assert network.run(1.0, pool=pool).meta["run_time"] == 1.0
+
+    def test_accepts_bytes(self, fake_server):
+        payload = {"simulation_meta": {"run_time": 1.0}}
+        with EnginePool() as pool:
+            assert pool.run_engine(orjson.dumps(payload))["output"] == []
+
+
+class TestEnginePoolFallback:
+    def test_spawns_per_run_without_serve(self, network):
+        with (
+            patch("pytms.pool._engine_capabilities", return_value=frozenset()),
+            patch(
+                "pytms.pool.run_engine",
+                return_value={"simulation_meta": {}, "output": []},
+            ) as mock_run,
+        ):
+            with EnginePool() as pool:
+                assert pool._proc is None
+                network.run(300.0, pool=pool)
+        mock_run.assert_called_once()
@@ -0,0 +1,80 @@
+import math
+
+import pytest
+
+from pytms import SimulationResult
+
+
+@pytest.fixture
+def result():
+    def log(service_id, distance):
+        return {
+            "service_id": service_id,
+            "current_position": {"edge": "A->B", "distance_along_edge": distance},
+            "state": "accelerating",
+        }
+
+    return SimulationResult(
+        {
+            "simulation_meta": {"simulation_id": "x", "run_time": 1, "time_step": 0.5},
+            "output": [
+                {"timestamp": 0, "service_logs": [log("S1", 0)]},
+                {"timestamp": 0.5, "service_logs": [log("S1", 0.25), log("S2", 3)]},
+                {"timestamp": 1, "service_logs": [log("S2", 4)]},
+            ],
+        }
+    )
+
+
+class TestDictAccess:
+    def test_meta(self, result):
+        assert result.meta["simulation_id"] == "x"
+
+    def test_repr(self, result):
+        assert repr(result) == "SimulationResult(simulation_id='x', steps=3)"
+
+
+class TestColumnarAccess:
+    @pytest.fixture(autouse=True)
+    def require_arrow(self):
+        pytest.importorskip("numpy")
+        pytest.importorskip("pyarrow")
+
+    def test_as_arrow_one_row_per_step(self, result):
+        table = result.as_arrow
+        assert table.num_rows == 3
+        assert result.as_arrow is table
+
+    def test_timestamps(self, result):
+        timestamps = result.timestamps
+        assert timestamps.dtype == "float64"
+        assert timestamps.tolist() == [0.0, 0.5, 1.0]
+
+    def test_service_positions(self, result):
+        positions = result.service_positions("S2")
+        assert math.isnan(positions[0])
+        assert positions[1:].tolist() == [3.0, 4.0]
+
+    def test_unknown_service_is_all_nan(self, result):
+        assert all(math.isnan(p) for p in result.service_positions("S9"))
+
+    def test_no_services_is_all_nan(self):
+        result = SimulationResult(
+            {
+                "simulation_meta": {"simulation_id": "x"},
+                "output": [
+                    {"timestamp": 0, "service_logs": []},
+                    {"timestamp": 1, "service_logs": []},
+                ],
+            }
+        )
+        assert result.timestamps.tolist() == [0.0, 1.0]
+        positions = result.service_positions("S1")
+        assert len(positions) == 2
+        assert all(math.isnan(p) for p in positions)
+
+    def test_empty_output(self):
+        result = SimulationResult({"simulation_meta": {}, "output": []})
+        assert result.timestamps.dtype == "float64"
+        assert len(result.timestamps) == 0
+        assert len(result.service_positions("S1")) == 0
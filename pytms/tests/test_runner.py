@@ -1,9 +1,27 @@
+import asyncio
 import json
-from unittest.mock import MagicMock, patch
+import os
+import subprocess
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from pytms.runner import _find_binary, _platform_binary_name, run_engine
+from pytms.runner import (
+    _engine_capabilities,
+    _find_binary,
+    _platform_binary_name,
+    _reset_binary_cache,
+    run_engine,
+    run_engine_async,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_binary_cache():
+    _reset_binary_cache()
+    yield
+    _reset_binary_cache()
 
 
 class TestPlatformBinaryName:
@@ -52,6 +70,24 @@ class TestFindBinary:
             mock_ref.__str__ = lambda s: str(fake_binary)
             result = _find_binary()
         assert result == fake_binary
+        assert fake_binary.stat().st_mode & 0o111
+
+    def test_leaves_executable_bundled_binary_alone(self, tmp_path):
+        fake_binary = tmp_path / "tms-engine-linux-amd64"
+        fake_binary.touch(mode=0o755)
+        with (
+            patch(
+                "pytms.runner._platform_binary_name",
+                return_value="tms-engine-linux-amd64",
+            ),
+            patch("pytms.runner.resources.files") as mock_files,
+            patch("pathlib.Path.chmod") as mock_chmod,
+        ):
+            files_mock = mock_files.return_value
+            mock_ref = files_mock.__truediv__.return_value.__truediv__.return_value
+            mock_ref.__str__ = lambda s: str(fake_binary)
+            assert _find_binary() == fake_binary
+        mock_chmod.assert_not_called()
 
     def test_falls_back_to_path(self, tmp_path):
         fake_binary = tmp_path / "tms-engine"
@@ -64,6 +100,17 @@ class TestFindBinary:
             result = _find_binary()
         assert result == fake_binary
 
+    def test_caches_result(self, tmp_path):
+        fake_binary = tmp_path / "tms-engine"
+        fake_binary.touch()
+        with (
+            patch("pytms.runner.resources.files", side_effect=FileNotFoundError),
+            patch("shutil.which", return_value=str(fake_binary)) as mock_which,
+        ):
+            assert _find_binary() == fake_binary
+            assert _find_binary() == fake_binary
+        mock_which.assert_called_once()
+
     def test_raises_when_not_found(self):
         with (
             patch("pytms.runner.resources.files", side_effect=FileNotFoundError),
@@ -73,12 +120,43 @@ class TestFindBinary:
                 _find_binary()
 
 
+class TestEngineCapabilities:
+    def _probe(self, tmp_path, stdout: bytes, returncode: int = 0):
+        fake_binary = tmp_path / "tms-engine"
+        fake_binary.touch()
+        proc = MagicMock(returncode=returncode, stdout=stdout)
+        with (
+            patch("pytms.runner._find_binary", return_value=fake_binary),
+            patch("subprocess.run", return_value=proc) as mock_run,
+        ):
+            capabilities = _engine_capabilities()
+        assert mock_run.call_args.args[0] == [str(fake_binary), "--capabilities"]
+        assert mock_run.call_args.kwargs["stdin"] is subprocess.DEVNULL
+        return capabilities
+
+    def test_parses_advertised_features(self, tmp_path):
+        assert self._probe(tmp_path, b'["batch"]') == {"batch"}
+
+    def test_none_when_flag_unsupported(self, tmp_path):
+        assert self._probe(tmp_path, b"", returncode=1) == frozenset()
+
+    def test_none_when_output_unparseable(self, tmp_path):
+        assert self._probe(tmp_path, b"not json") == frozenset()
+
+
 class TestRunEngine:
-    def _mock_completed_process(self, stdout: str, returncode: int = 0):
+    @pytest.fixture(autouse=True)
+    def no_capabilities(self):
+        with patch(
+            "pytms.runner._engine_capabilities",
+            side_effect=AssertionError("run_engine probed the engine"),
+        ):
+            yield
+
+    def _mock_process(self, stdout: bytes, returncode: int = 0, stderr: bytes = b""):
         proc = MagicMock()
         proc.returncode = returncode
-        proc.stdout = stdout
-        proc.stderr = ""
+        proc.communicate.return_value = (stdout, stderr)
         return proc
 
     def test_returns_parsed_json(self, tmp_path):
@@ -88,21 +166,200 @@ class TestRunEngine:
         with (
             patch("pytms.runner._find_binary", return_value=fake_binary),
             patch(
-                "subprocess.run",
-                return_value=self._mock_completed_process(json.dumps(output)),
+                "subprocess.Popen",
+                return_value=self._mock_process(json.dumps(output).encode()),
             ),
         ):
             result = run_engine("{}")
         assert result == output
 
+    def test_encodes_str_input(self, tmp_path):
+        fake_binary = tmp_path / "tms-engine"
+        fake_binary.touch()
+        proc = self._mock_process(b"{}")
+        with (
+            patch("pytms.runner._find_binary", return_value=fake_binary),
+            patch("subprocess.Popen", return_value=proc),
+        ):
+            run_engine("{}")
+        proc.communicate.assert_called_once_with(b"{}")
+
+    def test_streams_callback_input(self, tmp_path):
+        fake_binary = tmp_path / "tms-engine"
+        fake_binary.touch()
+        proc = self._mock_process(b"{}")
+        with (
+            patch("pytms.runner._find_binary", return_value=fake_binary),
+            patch("subprocess.Popen", return_value=proc),
+        ):
+            run_engine(lambda fp: fp.write(b"{}"))
+        proc.stdin.write.assert_called_once_with(b"{}")
+        proc.communicate.assert_called_once_with()
+
+    def test_spawns_with_default_process_options(self, tmp_path):
+        fake_binary = tmp_path / "tms-engine"
+        fake_binary.touch()
+        with (
+            patch("pytms.runner._find_binary", return_value=fake_binary),
+            patch("subprocess.Popen", return_value=self._mock_process(b"{}")) as popen,
+        ):
+            run_engine("{}")
+        options = popen.call_args.kwargs
+        for name in ("preexec_fn", "cwd", "env", "close_fds", "text", "shell"):
+            assert name not in options
+
+    def test_kills_engine_when_callback_fails(self, tmp_path):
+        fake_binary = tmp_path / "tms-engine"
+        fake_binary.touch()
+        proc = self._mock_process(b"")
+
+        def write_payload(fp):
+            raise ValueError("bad payload")
+
+        with (
+            patch("pytms.runner._find_binary", return_value=fake_binary),
+            patch("subprocess.Popen", return_value=proc),
+        ):
+            with pytest.raises(ValueError, match="bad payload"):
+                run_engine(write_payload)
+        proc.kill.assert_called_once()
+
+    def test_fixes_bundled_binary_once(self, tmp_path):
+        fake_binary = tmp_path / "tms-engine-linux-amd64"
+        fake_binary.touch(mode=0o644)
+        proc = MagicMock(returncode=0)
+        proc.communicate.return_value = (b"{}", b"")
+        with (
+            patch(
+                "pytms.runner._platform_binary_name",
+                return_value="tms-engine-linux-amd64",
+            ),
+            patch("pytms.runner.resources.files") as mock_files,
+            patch("subprocess.Popen", return_value=proc) as popen,
+            patch("pathlib.Path.chmod") as mock_chmod,
+        ):
+            files_mock = mock_files.return_value
+            mock_ref = files_mock.__truediv__.return_value.__truediv__.return_value
+            mock_ref.__str__ = lambda s: str(fake_binary)
+            run_engine("{}")
+            run_engine("{}")
+        mock_chmod.assert_called_once()
+        mock_files.assert_called_once()
+        assert popen.call_args.args[0] == [str(fake_binary)]
+
     def test_raises_on_nonzero_exit(self, tmp_path):
         fake_binary = tmp_path / "tms-engine"
         fake_binary.touch()
-        proc = self._mock_completed_process("", returncode=1)
-        proc.stderr = "something went wrong"
+        proc = self._mock_process(b"", returncode=1, stderr=b"something went wrong")
         with (
             patch("pytms.runner._find_binary", return_value=fake_binary),
-            patch("subprocess.run", return_value=proc),
+            patch("subprocess.Popen", return_value=proc),
         ):
             with pytest.raises(RuntimeError, match="exited with code 1"):
                 run_engine("{}")
+
+
+@pytest.mark.skipif(not os.path.isdir("/dev/shm"), reason="no /dev/shm")
+class TestRunEngineSharedMemoryOutput:
+    @pytest.fixture(autouse=True)
+    def output_path_capability(self, tmp_path):
+        fake_binary = tmp_path / "tms-engine"
+        fake_binary.touch()
+        with (
+            patch("pytms.runner._find_binary", return_value=fake_binary),
+            patch("pytms.runner._engine_capabilities", return_value={"output_path"}),
+        ):
+            yield
+
+    def _engine_writing(self, output: bytes, returncode: int = 0):
+        def popen(args, **kwargs):
+            assert args[1] == "--output-path"
+            with open(args[2], "wb") as f:
+                f.write(output)
+            proc = MagicMock(returncode=returncode)
+            proc.communicate.return_value = (b"", b"boom" if returncode else b"")
+            return proc
+
+        return popen
+
+    def test_reads_output_file(self):
+        output = {"simulation_meta": {}, "output": [{"timestamp": 0}]}
+        engine = self._engine_writing(json.dumps(output).encode())
+        with patch("subprocess.Popen", side_effect=engine) as popen:
+            assert run_engine("{}", shared_memory=True) == output
+        out_path = Path(popen.call_args.args[0][2])
+        assert out_path.parent == Path("/dev/shm")
+        assert not out_path.exists()
+
+    def test_raises_on_nonzero_exit(self):
+        with patch("subprocess.Popen", side_effect=self._engine_writing(b"", 1)):
+            with pytest.raises(RuntimeError, match="boom"):
+                run_engine("{}", shared_memory=True)
+
+    def test_raises_on_empty_output(self):
+        with patch("subprocess.Popen", side_effect=self._engine_writing(b"")):
+            with pytest.raises(RuntimeError, match="wrote no output"):
+                run_engine("{}", shared_memory=True)
+
+    def test_falls_back_to_stdout_without_shm(self, tmp_path):
+        proc = MagicMock(returncode=0)
+        proc.communicate.return_value = (b"{}", b"")
+        with (
+            patch("pytms.runner._SHM_DIR", str(tmp_path / "missing")),
+            patch("subprocess.Popen", return_value=proc) as popen,
+        ):
+            assert run_engine("{}", shared_memory=True) == {}
+        assert len(popen.call_args.args[0]) == 1
+
+    def test_uses_stdout_unless_requested(self):
+        proc = MagicMock(returncode=0)
+        proc.communicate.return_value = (b"{}", b"")
+        with patch("subprocess.Popen", return_value=proc) as popen:
+            assert run_engine("{}") == {}
+        assert len(popen.call_args.args[0]) == 1
+
+
+class TestRunEngineAsync:
+    def _mock_process(self, stdout: bytes, returncode: int = 0, stderr: bytes = b""):
+        proc = MagicMock()
+        proc.returncode = returncode
+        proc.communicate = AsyncMock(return_value=(stdout, stderr))
+        return proc
+
+    def test_returns_parsed_json(self, tmp_path):
+        fake_binary = tmp_path / "tms-engine"
+        fake_binary.touch()
+        proc = self._mock_process(b'{"output": []}')
+        with (
+            patch("pytms.runner._find_binary", return_value=fake_binary),
+            patch("asyncio.create_subprocess_exec", return_value=proc),
+        ):
+            result = asyncio.run(run_engine_async("{}"))
+        assert result == {"output": []}
+        proc.communicate.assert_awaited_once_with(b"{}")
+
+    def test_raises_on_nonzero_exit(self, tmp_path):
+        fake_binary = tmp_path / "tms-engine"
+        fake_binary.touch()
+        proc = self._mock_process(b"", returncode=1, stderr=b"something went wrong")
+        with (
+            patch("pytms.runner._find_binary", return_value=fake_binary),
+            patch("asyncio.create_subprocess_exec", return_value=proc),
+        ):
+            with pytest.raises(RuntimeError, match="something went wrong"):
+                asyncio.run(run_engine_async("{}"))
+
+    def test_kills_engine_when_cancelled(self, tmp_path):
+        fake_binary = tmp_path / "tms-engine"
+        fake_binary.touch()
+        proc = self._mock_process(b"")
+        proc.communicate.side_effect = asyncio.CancelledError
+        proc.wait = AsyncMock()
+        with (
+            patch("pytms.runner._find_binary", return_value=fake_binary),
+            patch("asyncio.create_subprocess_exec", return_value=proc),
+        ):
+            with pytest.raises(asyncio.CancelledError):
+                asyncio.run(run_engine_async("{}"))
+        proc.kill.assert_called_once()
+        proc.wait.assert_awaited_once()